@@ -2,17 +2,22 @@
 Configuration settings for the simple patent search.
 """
 import os
-from dotenv import load_dotenv
+from typing import Optional
 
-# Load environment variables
-load_dotenv()
+
+class _LazyOpenAIKey:
+    """Class-level descriptor that reads OPENAI_API_KEY only when it is first accessed."""
+    
+    def __get__(self, instance, owner) -> str:
+        return owner.get_openai_api_key()
 
 
 class Config:
     """Configuration class for the simple patent search."""
     
-    # API Keys
-    OPENAI_API_KEY: str = os.environ.get("OPENAI_API_KEY", "")
+    # API Keys (loaded from the environment / .env on first use)
+    OPENAI_API_KEY = _LazyOpenAIKey()
+    _openai_api_key: Optional[str] = None
     
     # OpenAI Settings
     OPENAI_MODEL: str = "gpt-4.1"
@@ -21,20 +26,37 @@ class Config:
     # Patent Search Settings
     MAX_PATENTS: int = 20
     SIMILARITY_THRESHOLD: float = 0.8
+    BATCH_TITLE_LOOKUP: bool = False
     
     # Web Scraping Settings
     REQUEST_TIMEOUT: int = 15
     REQUEST_DELAY: int = 2
+    REQUEST_BURST: int = 4
     MAX_RETRIES: int = 3
+    RETRY_BACKOFF: float = 1.0
+    MAX_CONCURRENT_REQUESTS: int = 4
+    MAX_PAGE_BYTES: int = 256 * 1024
     
     # Output Settings
     RESULTS_DIR: str = "results"
+    TITLE_CACHE_DIR: str = os.path.join(RESULTS_DIR, ".title_cache")
+    
+    @classmethod
+    def get_openai_api_key(cls) -> str:
+        """Get the OpenAI API key, loading .env the first time it is needed."""
+        if cls._openai_api_key is None:
+            from dotenv import load_dotenv
+            load_dotenv()
+            cls._openai_api_key = os.environ.get("OPENAI_API_KEY", "")
+        return cls._openai_api_key
     
     @classmethod
     def validate(cls) -> None:
         """Validate configuration settings."""
         if not cls.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY environment variable is required")
+        if cls.REQUEST_DELAY < 0:
+            raise ValueError("REQUEST_DELAY must be 0 (no rate limit) or a positive number of seconds")
     
     @classmethod
     def get_output_path(cls, compound: str) -> str:
@@ -3,12 +3,40 @@ Simple Patent Search - Main entry point.
 Combines OpenAI patent search with title similarity verification.
 """
 import json
+import logging
+import queue
 import sys
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, List
 from config import Config
 from patent_search import PatentSearcher
 from title_verification import TitleVerifier
 
+logger = logging.getLogger(__name__)
+
+
+def setup_logging() -> QueueListener:
+    """
+    Route log records through a queue drained by one background thread.
+    
+    Callers only enqueue records, so verification never blocks on terminal
+    I/O. Stop the returned listener to flush pending records.
+    """
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    
+    root_logger = logging.getLogger()
+    root_logger.addHandler(QueueHandler(log_queue))
+    root_logger.setLevel(logging.INFO)
+    # httpx logs every request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
 
 def run_patent_search(compound: str) -> Dict[str, Any]:
     """
@@ -20,103 +48,175 @@ def run_patent_search(compound: str) -> Dict[str, Any]:
     Returns:
         Dictionary with search results and statistics
     """
-    print("🚀" + "=" * 60)
-    print("🚀 SIMPLE PATENT SEARCH STARTING")
-    print("🚀" + "=" * 60)
-    print(f"🧪 Compound: {compound}")
-    print(f"🎯 Max patents: {Config.MAX_PATENTS}")
-    print(f"📊 Similarity threshold: {Config.SIMILARITY_THRESHOLD}")
-    print(f"🤖 Model: {Config.OPENAI_MODEL}")
-    print("=" * 70)
+    logger.info("🚀" + "=" * 60)
+    logger.info("🚀 SIMPLE PATENT SEARCH STARTING")
+    logger.info("🚀" + "=" * 60)
+    logger.info(f"🧪 Compound: {compound}")
+    logger.info(f"🎯 Max patents: {Config.MAX_PATENTS}")
+    logger.info(f"📊 Similarity threshold: {Config.SIMILARITY_THRESHOLD}")
+    logger.info(f"🤖 Model: {Config.OPENAI_MODEL}")
+    logger.info("=" * 70)
     
     try:
         # Validate configuration
         Config.validate()
-        print("✅ Configuration validated")
+        logger.info("✅ Configuration validated")
         
         # Step 1: Search for patents using OpenAI
-        print("\n" + "=" * 50)
-        print("STEP 1: PATENT SEARCH")
-        print("=" * 50)
+        logger.info("\n" + "=" * 50)
+        logger.info("STEP 1: PATENT SEARCH")
+        logger.info("=" * 50)
         
         searcher = PatentSearcher()
         patents = searcher.search_patents(compound)
         
-        if not patents:
-            print("❌ No patents found")
-            return {
-                "compound": compound,
-                "patents_found": 0,
-                "patents_verified": 0,
-                "verified_patents": [],
-                "success": False,
-                "message": "No patents found by OpenAI search"
-            }
-        
-        # Step 2: Verify patents with title similarity matching
-        print("\n" + "=" * 50)
-        print("STEP 2: TITLE VERIFICATION")
-        print("=" * 50)
-        
-        verifier = TitleVerifier()
-        verified_patents = verifier.verify_patents(patents, compound)
-        
-        # Generate final results
-        results = {
-            "compound": compound,
-            "patents_found": len(patents),
-            "patents_verified": len(verified_patents),
-            "verified_patents": verified_patents,
-            "success": True,
-            "output_file": Config.get_output_path(compound)
-        }
-        
-        # Print summary
-        print("\n" + "🎉" * 50)
-        print("SEARCH COMPLETE")
-        print("🎉" * 50)
-        print(f"📋 Patents found: {len(patents)}")
-        print(f"✅ Patents verified: {len(verified_patents)}")
-        print(f"📊 Success rate: {len(verified_patents)/len(patents)*100:.1f}%")
-        print(f"💾 Results saved to: {results['output_file']}")
+        return _verify_search_results(compound, patents, searcher)
         
-        if verified_patents:
-            print("\n📋 VERIFIED PATENTS:")
-            for i, patent in enumerate(verified_patents):
-                print(f"  {i+1}. {patent['patent_id']} - {patent['title'][:60]}...")
-                print(f"     Relevancy: {patent['relevancy']}")
-                print(f"     Similarity: {patent['similarity_score']:.3f}")
-        
-        return results
+    except Exception as e:
+        return _error_result(compound, e)
+
+
+def run_patent_search_many(compounds: List[str]) -> List[Dict[str, Any]]:
+    """
+    Run the patent search and verification process for several compounds.
+    
+    OpenAI searches run in a background thread, up to two compounds ahead,
+    while the current compound's titles are verified, so OpenAI latency
+    overlaps with Google Patents latency.
+    
+    Args:
+        compounds: Chemical compounds to search for
         
+    Returns:
+        List of result dictionaries, in the same order as compounds
+    """
+    logger.info("🚀" + "=" * 60)
+    logger.info(f"🚀 SIMPLE PATENT SEARCH STARTING ({len(compounds)} compounds)")
+    logger.info("🚀" + "=" * 60)
+    logger.info(f"🎯 Max patents: {Config.MAX_PATENTS}")
+    logger.info(f"📊 Similarity threshold: {Config.SIMILARITY_THRESHOLD}")
+    logger.info(f"🤖 Model: {Config.OPENAI_MODEL}")
+    logger.info("=" * 70)
+    
+    try:
+        Config.validate()
+        logger.info("✅ Configuration validated")
+        searcher = PatentSearcher()
     except Exception as e:
-        error_msg = f"❌ Critical error: {e}"
-        print(error_msg)
+        return [_error_result(compound, e) for compound in compounds]
+    
+    results = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        searches = [executor.submit(searcher.search_patents, compound) for compound in compounds[:2]]
+        
+        for i, compound in enumerate(compounds):
+            # Keep at most two searches queued ahead of verification
+            if i + 2 < len(compounds):
+                searches.append(executor.submit(searcher.search_patents, compounds[i + 2]))
+            
+            try:
+                patents = searches[i].result()
+                logger.info("\n" + "=" * 70)
+                logger.info(f"🧪 Compound {i+1}/{len(compounds)}: {compound}")
+                logger.info("=" * 70)
+                results.append(_verify_search_results(compound, patents, searcher))
+            except Exception as e:
+                results.append(_error_result(compound, e))
+    
+    return results
+
+
+def _verify_search_results(compound: str, patents: List[Dict[str, Any]],
+                           searcher: PatentSearcher) -> Dict[str, Any]:
+    """Verify the patents found for a compound and summarize the results."""
+    if not patents:
+        logger.error("❌ No patents found")
         return {
             "compound": compound,
             "patents_found": 0,
             "patents_verified": 0,
             "verified_patents": [],
             "success": False,
-            "error": str(e)
+            "message": "No patents found by OpenAI search"
         }
+    
+    # Step 2: Verify patents with title similarity matching
+    logger.info("\n" + "=" * 50)
+    logger.info("STEP 2: TITLE VERIFICATION")
+    logger.info("=" * 50)
+    
+    verifier = TitleVerifier(searcher)
+    verified_patents = verifier.verify_patents(patents, compound)
+    
+    # Generate final results
+    results = {
+        "compound": compound,
+        "patents_found": len(patents),
+        "patents_verified": len(verified_patents),
+        "verified_patents": verified_patents,
+        "success": True,
+        "output_file": Config.get_output_path(compound)
+    }
+    
+    # Print summary
+    logger.info("\n" + "🎉" * 50)
+    logger.info("SEARCH COMPLETE")
+    logger.info("🎉" * 50)
+    logger.info(f"📋 Patents found: {len(patents)}")
+    logger.info(f"✅ Patents verified: {len(verified_patents)}")
+    logger.info(f"📊 Success rate: {len(verified_patents)/len(patents)*100:.1f}%")
+    logger.info(f"💾 Results saved to: {results['output_file']}")
+    
+    if verified_patents:
+        logger.info("\n📋 VERIFIED PATENTS:")
+        for i, patent in enumerate(verified_patents):
+            logger.info(f"  {i+1}. {patent['patent_id']} - {patent['title'][:60]}...")
+            logger.info(f"     Relevancy: {patent['relevancy']}")
+            logger.info(f"     Similarity: {patent['similarity_score']:.3f}")
+    
+    return results
+
+
+def _error_result(compound: str, error: Exception) -> Dict[str, Any]:
+    """Log a critical error and build the failed result for a compound."""
+    error_msg = f"❌ Critical error: {error}"
+    logger.error(error_msg)
+    return {
+        "compound": compound,
+        "patents_found": 0,
+        "patents_verified": 0,
+        "verified_patents": [],
+        "success": False,
+        "error": str(error)
+    }
 
 
 def main():
     """Main function for command line usage."""
-    if len(sys.argv) != 2:
-        print("Usage: python main.py '<compound_name>'")
+    if len(sys.argv) < 2:
+        print("Usage: python main.py '<compound_name>' ['<compound_name>' ...]")
         print("Example: python main.py '3-(trifluoromethyl)pyridine-4-carboxamide'")
         sys.exit(1)
     
-    compound = sys.argv[1]
-    results = run_patent_search(compound)
+    compounds = sys.argv[1:]
+    listener = setup_logging()
+    try:
+        if len(compounds) == 1:
+            all_results = [run_patent_search(compounds[0])]
+        else:
+            all_results = run_patent_search_many(compounds)
+    finally:
+        # Flush queued log records before the final status lines
+        listener.stop()
+    
+    failed = [results for results in all_results if not results["success"]]
+    for results in failed:
+        print(f"\n❌ Search failed for {results['compound']}: {results.get('error', 'Unknown error')}")
     
-    if results["success"]:
+    if not failed:
         print(f"\n✅ Search completed successfully!")
         sys.exit(0)
     else:
-        print(f"\n❌ Search failed: {results.get('error', 'Unknown error')}")
         sys.exit(1)
 
 
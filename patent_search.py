@@ -1,21 +1,31 @@
 """
 OpenAI-based patent search functionality.
 """
-import json
+import functools
+import logging
+import orjson
 from typing import List, Dict, Any
 from openai import OpenAI
 from config import Config
 
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def get_openai_client() -> OpenAI:
+    """Get the process-wide OpenAI client, so its connection pool is reused across searches."""
+    return OpenAI(
+        api_key=Config.OPENAI_API_KEY,
+        timeout=Config.OPENAI_TIMEOUT
+    )
+
 
 class PatentSearcher:
     """Handles patent search using OpenAI API."""
     
     def __init__(self):
         """Initialize the patent searcher."""
-        self.client = OpenAI(
-            api_key=Config.OPENAI_API_KEY,
-            timeout=Config.OPENAI_TIMEOUT
-        )
+        self.client = get_openai_client()
     
     def search_patents(self, compound: str) -> List[Dict[str, Any]]:
         """
@@ -27,13 +37,13 @@ class PatentSearcher:
         Returns:
             List of patent dictionaries with patent_id, title, and relevancy
         """
-        print(f"🔍 Searching for patents related to: {compound}")
+        logger.info(f"🔍 Searching for patents related to: {compound}")
         
         # Build the search prompt
         prompt = self._build_search_prompt(compound)
         
         try:
-            print("🤖 Calling OpenAI API...")
+            logger.info("🤖 Calling OpenAI API...")
             response = self.client.responses.create(
                 model=Config.OPENAI_MODEL,
                 tools=[{
@@ -44,22 +54,82 @@ class PatentSearcher:
             )
 
             response_text = response.output_text.strip()
-            print(f"✅ Received response ({len(response_text)} characters)")
+            logger.info(f"✅ Received response ({len(response_text)} characters)")
 
             # Parse JSON response
-            patents_data = json.loads(response_text)
+            patents_data = orjson.loads(response_text)
             patents = patents_data.get("patents", [])
 
-            print(f"📋 Found {len(patents)} patents")
+            logger.info(f"📋 Found {len(patents)} patents")
             return patents
             
-        except json.JSONDecodeError as e:
-            print(f"❌ Failed to parse JSON response: {e}")
+        except orjson.JSONDecodeError as e:
+            logger.error(f"❌ Failed to parse JSON response: {e}")
             return []
         except Exception as e:
-            print(f"❌ OpenAI API error: {e}")
+            logger.error(f"❌ OpenAI API error: {e}")
             return []
     
+    def verify_titles_batch(self, patent_ids: List[str]) -> Dict[str, str]:
+        """
+        Look up the official English titles of several patents in one OpenAI call.
+        
+        Args:
+            patent_ids: Patent IDs to look up
+            
+        Returns:
+            Dictionary mapping patent_id to title; IDs the model could not
+            confirm are omitted so callers can fall back to scraping
+        """
+        if not patent_ids:
+            return {}
+        
+        logger.info(f"🤖 Looking up {len(patent_ids)} patent titles in one OpenAI call...")
+        prompt = self._build_title_prompt(patent_ids)
+        
+        try:
+            response = self.client.responses.create(
+                model=Config.OPENAI_MODEL,
+                tools=[{
+                    "type": "web_search_preview",
+                    "search_context_size": "high",
+                }],
+                input=prompt,
+            )
+
+            titles_data = orjson.loads(response.output_text.strip())
+            titles = {
+                patent_id: title.strip()
+                for patent_id, title in titles_data.items()
+                if patent_id in patent_ids and isinstance(title, str) and title.strip()
+            }
+
+            logger.info(f"📋 Received titles for {len(titles)}/{len(patent_ids)} patents")
+            return titles
+            
+        except orjson.JSONDecodeError as e:
+            logger.error(f"❌ Failed to parse title lookup response: {e}")
+            return {}
+        except Exception as e:
+            logger.error(f"❌ OpenAI title lookup error: {e}")
+            return {}
+    
+    def _build_title_prompt(self, patent_ids: List[str]) -> str:
+        """Build the batched title lookup prompt for OpenAI."""
+        id_lines = "\n".join(f"- {patent_id}" for patent_id in patent_ids)
+        return f"""
+For each patent ID below, find its official English title as shown on Google Patents (https://patents.google.com/patent/<ID>/en).
+
+{id_lines}
+
+##Output##
+CRITICAL: You MUST respond with ONLY valid JSON mapping each patent ID to its title (no other text, no explanations, no markdown):
+{{"US1234567A": "Synthesis of compound X", ...}}
+
+- Never guess or invent a title. If you cannot confirm the title of a patent, leave its ID out of the output.
+- RESPOND WITH ONLY THE JSON OBJECT - NO OTHER TEXT
+"""
+    
     def _build_search_prompt(self, compound: str) -> str:
         """Build the search prompt for OpenAI."""
         return f"""
@@ -0,0 +1,35 @@
+"""
+Tests for title similarity scoring in TitleVerifier.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from title_verification import TitleVerifier
+
+
+def test_identical_titles_score_one():
+    scores = TitleVerifier._calculate_similarities_batch(
+        ['Method for Z'], [' method for z ']
+    )
+    assert scores.tolist() == [1.0]
+
+
+def test_equal_length_different_titles_are_scored():
+    scores = TitleVerifier._calculate_similarities_batch(
+        ['Method for Z', 'abc'], ['Method for Y', 'xyz']
+    )
+    assert scores[0] < 1.0
+    assert round(scores[0], 2) == 0.92
+    assert scores[1] == 0.0
+
+
+def test_length_mismatched_titles_get_exact_score():
+    # The length bound here is 2*2/12 = 0.333; the real Indel ratio is 2*1/12
+    scores = TitleVerifier._calculate_similarities_batch(['ax'], ['abcdefghij'])
+    assert round(scores[0], 3) == 0.167
+
+
+def test_empty_batch():
+    assert TitleVerifier._calculate_similarities_batch([], []).size == 0
@@ -1,26 +1,108 @@
 """
 Patent title verification using web scraping and similarity matching.
 """
-import json
+import asyncio
+import functools
+import hashlib
+import html
+import logging
+import os
+import re
 import time
-import requests
-from typing import List, Dict, Any, Optional
-from difflib import SequenceMatcher
-from bs4 import BeautifulSoup
+import httpx
+import lxml.etree
+import lxml.html
+import numpy as np
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Set, Tuple
+from rapidfuzz import process
+from rapidfuzz.distance import Indel
 from config import Config
+from patent_search import PatentSearcher
+
+logger = logging.getLogger(__name__)
+
+# Chinese characters, Japanese Hiragana/Katakana and Korean Hangul
+_CJK_RE = re.compile(r'[\u4e00-\u9fff\u3040-\u30ff\uac00-\ud7af]')
+
+# Google Patents puts the bare title in a <head> meta tag and in span[itemprop=title];
+# matching either on raw bytes avoids parsing the page at all
+_TITLE_RE = re.compile(
+    rb'<meta[^>]+name="DC\.title"[^>]+content="([^"]+)"|<span[^>]*itemprop="title"[^>]*>([^<]+)</span>',
+    re.IGNORECASE
+)
+
+# Placeholder answers (mostly from the batched OpenAI lookup) that are not real titles
+_PLACEHOLDER_TITLES = {'unknown', 'n/a', 'na', 'none', 'not found', 'not available', 'title not found'}
+
+
+def _run_coroutine(coroutine):
+    """
+    Run a coroutine to completion from synchronous code.
+
+    asyncio.run cannot be nested, so when the caller is already inside an
+    event loop (Jupyter, async applications) the coroutine runs on its own
+    loop in a helper thread while this call blocks.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+class _TokenBucket:
+    """
+    Async token bucket allowing bursts of `capacity` requests, refilled at `rate` per second.
+
+    A rate of 0 or less disables rate limiting.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        """Initialize a full bucket. Must be created inside the running event loop."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
 
 
 class TitleVerifier:
     """Handles patent title verification through web scraping."""
 
-    def __init__(self):
-        """Initialize the title verifier."""
-        self.session = requests.Session()
+    def __init__(self, searcher: Optional[PatentSearcher] = None):
+        """
+        Initialize the title verifier.
+
+        Args:
+            searcher: Patent searcher used for batched title lookups when
+                Config.BATCH_TITLE_LOOKUP is enabled
+        """
+        self.searcher = searcher
         # **CHANGE 2: ADD THE ACCEPT-LANGUAGE HEADER**
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Accept-Language': 'en-US,en;q=0.9'
-        })
+        }
+        # Patents already written for the compound being verified
+        self._saved_patents: List[Dict[str, Any]] = []
+        self._seen_ids: Set[str] = set()
 
     def verify_patents(self, patents: List[Dict[str, Any]], compound: str) -> List[Dict[str, Any]]:
         """
@@ -33,28 +115,59 @@ class TitleVerifier:
         Returns:
             List of verified patent dictionaries
         """
-        print(f"🔍 Verifying {len(patents)} patents...")
+        # Drop repeated patent IDs up front so each is fetched and scored once
+        unique_patents = {}
+        for patent in patents:
+            unique_patents.setdefault(patent.get('patent_id', ''), patent)
+        if len(unique_patents) < len(patents):
+            logger.info(f"🧹 Skipping {len(patents) - len(unique_patents)} duplicate patent IDs")
+        patents = list(unique_patents.values())
+
+        logger.info(f"🔍 Verifying {len(patents)} patents...")
         verified_patents = []
+        output_path = Config.get_output_path(compound)
+        self._saved_patents = self._load_saved_patents(output_path)
+        self._seen_ids = {patent.get('patent_id') for patent in self._saved_patents}
+
+        patent_ids = [patent.get('patent_id', '') for patent in patents]
+        actual_titles = {}
+        if Config.BATCH_TITLE_LOOKUP and self.searcher is not None:
+            batch_titles = self.searcher.verify_titles_batch(patent_ids)
+            actual_titles = {
+                patent_id: title for patent_id, title in batch_titles.items()
+                if self._is_valid_title(title)
+            }
+
+        # Scrape whatever the batch lookup missed or returned an invalid title for
+        missing_ids = [patent_id for patent_id in patent_ids if patent_id not in actual_titles]
+        if missing_ids:
+            actual_titles.update(_run_coroutine(self._fetch_titles(missing_ids)))
+
+        # Score every found (claimed, actual) pair in one native call; saving stays serial, in input order
+        found = [i for i, patent_id in enumerate(patent_ids) if actual_titles.get(patent_id) is not None]
+        scores = self._calculate_similarities_batch(
+            [patents[i].get('title', '') for i in found],
+            [actual_titles[patent_ids[i]] for i in found]
+        )
+        similarities = dict(zip(found, scores.tolist()))
 
         for i, patent in enumerate(patents):
             patent_id = patent.get('patent_id', '')
             claimed_title = patent.get('title', '')
             relevancy = patent.get('relevancy', '')
 
-            print(f"📋 Verifying patent {i+1}/{len(patents)}: {patent_id}")
+            logger.info(f"📋 Verifying patent {i+1}/{len(patents)}: {patent_id}")
 
-            # Get actual title from web
-            actual_title = self._get_patent_title(patent_id)
+            actual_title = actual_titles.get(patent_id)
 
             if actual_title is None:
-                print(f"❌ Patent {patent_id} not found")
+                logger.error(f"❌ Patent {patent_id} not found")
                 continue
 
-            # Calculate title similarity
-            similarity = self._calculate_similarity(claimed_title, actual_title)
-            print(f"📊 Title similarity: {similarity:.3f}")
-            print(f"   Claimed: {claimed_title}")
-            print(f"   Actual:  {actual_title}")
+            similarity = similarities[i]
+            logger.info(f"📊 Title similarity: {similarity:.3f}")
+            logger.info(f"   Claimed: {claimed_title}")
+            logger.info(f"   Actual:  {actual_title}")
 
             # Check if title contains non-English characters (like Chinese)
             is_non_english = self._contains_non_english(actual_title)
@@ -75,45 +188,113 @@ class TitleVerifier:
             verified_patents.append(verified_patent)
 
             if similarity >= Config.SIMILARITY_THRESHOLD:
-                print(f"✅ Patent {patent_id} verified (similarity: {similarity:.3f})")
+                logger.info(f"✅ Patent {patent_id} verified (similarity: {similarity:.3f})")
             else:
-                print(f"⚠️ Patent {patent_id} saved with low similarity (similarity: {similarity:.3f})")
+                logger.warning(f"⚠️ Patent {patent_id} saved with low similarity (similarity: {similarity:.3f})")
 
-            # Save immediately to JSON
-            self._save_verified_patent(verified_patent, compound)
+            # Save immediately to the JSONL journal
+            self._save_verified_patent(verified_patent, output_path)
 
-            # Add delay between requests
-            if i < len(patents) - 1:
-                time.sleep(Config.REQUEST_DELAY)
-
-        print(f"✅ Verification complete: {len(verified_patents)}/{len(patents)} patents verified")
+        self._compact_saved_patents(compound, output_path)
+        logger.info(f"✅ Verification complete: {len(verified_patents)}/{len(patents)} patents verified")
         return verified_patents
 
-    def _get_patent_title(self, patent_id: str) -> Optional[str]:
-        """Fetch patent title from Google Patents."""
+    async def _fetch_titles(self, patent_ids: List[str]) -> Dict[str, Optional[str]]:
+        """Fetch titles for all patent IDs concurrently over one HTTP/2 client, keyed by patent ID."""
+        # Caps in-flight requests to patents.google.com, and their average rate
+        request_slots = asyncio.Semaphore(Config.MAX_CONCURRENT_REQUESTS)
+        request_rate = 1 / Config.REQUEST_DELAY if Config.REQUEST_DELAY > 0 else 0
+        request_bucket = _TokenBucket(rate=request_rate, capacity=Config.REQUEST_BURST)
+        async with httpx.AsyncClient(
+            http2=True,
+            headers=self.headers,
+            timeout=Config.REQUEST_TIMEOUT,
+            follow_redirects=True
+        ) as client:
+            titles = await asyncio.gather(*(
+                self._fetch_title_politely(client, request_slots, request_bucket, patent_id)
+                for patent_id in patent_ids
+            ))
+        return dict(zip(patent_ids, titles))
+
+    async def _fetch_title_politely(self, client: httpx.AsyncClient, request_slots: asyncio.Semaphore,
+                                    request_bucket: _TokenBucket, patent_id: str) -> Optional[str]:
+        """Fetch a patent title once the rate limit allows, holding one of the per-host request slots."""
+        # Titles never change, so a cached one needs no request and no delay
+        title = self._read_cached_title(patent_id)
+        if title is not None:
+            logger.info(f"📦 Using cached title for {patent_id}")
+            return title
+
+        async with request_slots:
+            title = await self._get_patent_title(client, request_bucket, patent_id)
+
+        if title is not None:
+            self._write_cached_title(patent_id, title)
+        return title
+
+    def _title_cache_path(self, patent_id: str) -> str:
+        """Get the on-disk cache file path for a patent title."""
+        key = hashlib.sha256(patent_id.encode('utf-8')).hexdigest()
+        return os.path.join(Config.TITLE_CACHE_DIR, f"{key}.txt")
+
+    def _read_cached_title(self, patent_id: str) -> Optional[str]:
+        """Read a previously fetched title from the disk cache."""
+        try:
+            with open(self._title_cache_path(patent_id), 'r', encoding='utf-8') as f:
+                return f.read() or None
+        except OSError:
+            return None
+
+    def _write_cached_title(self, patent_id: str, title: str) -> None:
+        """Write a fetched title to the disk cache."""
+        try:
+            os.makedirs(Config.TITLE_CACHE_DIR, exist_ok=True)
+            with open(self._title_cache_path(patent_id), 'w', encoding='utf-8') as f:
+                f.write(title)
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to cache title for {patent_id}: {e}")
+
+    async def _get_patent_title(self, client: httpx.AsyncClient, request_bucket: _TokenBucket,
+                                patent_id: str) -> Optional[str]:
+        """Fetch patent title from Google Patents, taking a rate-limit token for every attempt."""
         # **CHANGE 1: ADD /en TO THE URL**
         url = f"https://patents.google.com/patent/{patent_id}/en"
 
         for attempt in range(Config.MAX_RETRIES):
+            # Exponential backoff between attempts, unless the server asks for longer
+            retry_delay = Config.RETRY_BACKOFF * 2 ** attempt
+            await request_bucket.acquire()
             try:
-                # Use the updated session headers here automatically
-                response = self.session.get(url, timeout=Config.REQUEST_TIMEOUT)
-                response.raise_for_status()
-
-                soup = BeautifulSoup(response.content, 'html.parser')
+                # Use the client headers here automatically
+                async with client.stream('GET', url) as response:
+                    response.raise_for_status()
+                    content, title = await self._read_until_title(response)
+
+                if title is not None:
+                    return title
+
+                # An empty or unparseable page has no title; retrying will not change that
+                try:
+                    tree = lxml.html.fromstring(bytes(content)) if content.strip() else None
+                except lxml.etree.ParserError:
+                    tree = None
+                if tree is None:
+                    logger.warning(f"⚠️ Title tag not found on page for {patent_id}")
+                    return None
 
                 # Try to find title using itemprop="title"
-                title_tag = soup.find('span', itemprop='title')
-                if title_tag:
-                    title = title_tag.get_text(strip=True)
+                title_tags = tree.xpath('//span[@itemprop="title"]')
+                if title_tags:
+                    title = title_tags[0].text_content().strip()
                     # Validate that it's actually a title, not an abstract
                     if self._is_valid_title(title):
                         return title
 
                 # Fallback to h1 tag
-                h1_tag = soup.find('h1', itemprop='pageTitle')
-                if h1_tag:
-                    full_title = h1_tag.get_text(strip=True)
+                h1_tags = tree.xpath('//h1[@itemprop="pageTitle"]')
+                if h1_tags:
+                    full_title = h1_tags[0].text_content().strip()
                     # This cleanup is still useful
                     title = full_title.split(' - Google Patents')[0].replace(f"{patent_id} - ", "").strip()
                     if self._is_valid_title(title):
@@ -121,84 +302,183 @@ class TitleVerifier:
 
                 # If an English version doesn't exist, Google might 404.
                 # If we get a page but no title, it's still a failure for this function.
-                print(f"⚠️ Title tag not found on page for {patent_id}")
+                logger.warning(f"⚠️ Title tag not found on page for {patent_id}")
                 return None
 
-            except requests.exceptions.HTTPError as e:
+            except httpx.HTTPStatusError as e:
                 # Specifically handle 404 errors if the /en version doesn't exist
                 if e.response.status_code == 404:
-                    print(f"⚠️ English version (/en) not found for {patent_id}. It may only exist in its original language.")
+                    logger.warning(f"⚠️ English version (/en) not found for {patent_id}. It may only exist in its original language.")
                     return None # Explicitly return None on 404
-                print(f"⚠️ Attempt {attempt + 1} failed for {patent_id} with HTTP error: {e}")
+                logger.warning(f"⚠️ Attempt {attempt + 1} failed for {patent_id} with HTTP error: {e}")
+                if e.response.status_code == 429 or e.response.status_code >= 500:
+                    retry_delay = max(retry_delay, self._retry_after(e.response))
             except Exception as e:
-                print(f"⚠️ Attempt {attempt + 1} failed for {patent_id}: {e}")
+                logger.warning(f"⚠️ Attempt {attempt + 1} failed for {patent_id}: {e}")
 
             if attempt < Config.MAX_RETRIES - 1:
-                time.sleep(1)
+                await asyncio.sleep(retry_delay)
 
         return None # Return None after all retries fail
 
-    def _calculate_similarity(self, title1: str, title2: str) -> float:
-        """Calculate similarity between two titles."""
-        title1_norm = title1.lower().strip()
-        title2_norm = title2.lower().strip()
-        return SequenceMatcher(None, title1_norm, title2_norm).ratio()
+    def _retry_after(self, response: httpx.Response) -> float:
+        """Seconds the server asked us to wait via Retry-After (capped at a minute), or 0 if it did not say."""
+        try:
+            return min(60.0, max(0.0, float(response.headers.get('Retry-After', 0))))
+        except ValueError:
+            # HTTP-date form; fall back to our own backoff
+            return 0.0
+
+    async def _read_until_title(self, response: httpx.Response) -> Tuple[bytearray, Optional[str]]:
+        """
+        Stream a page until a valid title tag appears or the byte cap is hit.
+
+        Matches that fail _is_valid_title are skipped and streaming goes on,
+        so the XPath fallback sees as much of the page as the baseline did.
+        """
+        content = bytearray()
+        search_from = 0
+        async for chunk in response.aiter_bytes(chunk_size=8192):
+            content += chunk
+            for match in _TITLE_RE.finditer(content, search_from):
+                raw_title = match.group(1) or match.group(2)
+                title = ' '.join(html.unescape(raw_title.decode('utf-8', errors='replace')).split())
+                if self._is_valid_title(title):
+                    return content, title
+                search_from = match.end()
+            # Re-scan a small overlap so a tag split across chunks is still found
+            search_from = max(search_from, len(content) - 2048)
+            if len(content) >= Config.MAX_PAGE_BYTES:
+                break
+        return content, None
+
+    @staticmethod
+    def _calculate_similarities_batch(claimed_titles: List[str], actual_titles: List[str]) -> np.ndarray:
+        """
+        Calculate the similarity of each (claimed, actual) title pair.
 
-    def _contains_non_english(self, text: str) -> bool:
+        Titles are compared case-insensitively with RapidFuzz's Indel ratio,
+        2*LCS/(len1+len2), the same shape as SequenceMatcher.ratio(). Every
+        score is exact, since it is saved as the pair's similarity_score.
+        """
+        claimed_norm = [title.lower().strip() for title in claimed_titles]
+        actual_norm = [title.lower().strip() for title in actual_titles]
+        identical = np.array([claimed == actual for claimed, actual in zip(claimed_norm, actual_norm)], dtype=bool)
+        scores = np.ones(len(claimed_norm), dtype=np.float64)
+
+        # Indel has no autojunk heuristic, and cpdist builds each string's pattern
+        # once in native code, so there is no per-pair index to hoist here.
+        candidates = np.flatnonzero(~identical)
+        if candidates.size:
+            scores[candidates] = process.cpdist(
+                [claimed_norm[i] for i in candidates],
+                [actual_norm[i] for i in candidates],
+                scorer=Indel.normalized_similarity,
+                dtype=np.float64
+            )
+        return scores
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _contains_non_english(text: str) -> bool:
         """Check if text contains non-English characters (Chinese, Japanese, Korean, etc.)."""
-        for char in text:
-            # Chinese characters
-            if '\u4e00' <= char <= '\u9fff':
-                return True
-            # Japanese Hiragana and Katakana
-            if '\u3040' <= char <= '\u30ff':
-                return True
-            # Korean Hangul
-            if '\uac00' <= char <= '\ud7af':
-                return True
-        return False
+        # Most Google Patents titles are plain ASCII
+        if text.isascii():
+            return False
+        return _CJK_RE.search(text) is not None
 
     def _is_valid_title(self, text: str) -> bool:
         """Check if the extracted text is a valid title (not an abstract or other content)."""
         if not text:
             return False
 
+        # Check for placeholders returned instead of a title
+        if text.lower().strip(' .') in _PLACEHOLDER_TITLES:
+            logger.warning(f"⚠️ Detected placeholder instead of title: {text}")
+            return False
+
         # Check if it starts with "Abstract" (common issue)
         if text.lower().startswith('abstract'):
-            print(f"⚠️ Detected abstract instead of title: {text[:50]}...")
+            logger.warning(f"⚠️ Detected abstract instead of title: {text[:50]}...")
             return False
 
         # Check if it's too long to be a title (likely an abstract or description)
         if len(text) > 300:
-            print(f"⚠️ Text too long to be a title ({len(text)} chars): {text[:50]}...")
+            logger.warning(f"⚠️ Text too long to be a title ({len(text)} chars): {text[:50]}...")
             return False
 
         # Check if it contains multiple sentences (likely an abstract)
         sentence_count = text.count('.') + text.count('!') + text.count('?')
         if sentence_count > 2:
-            print(f"⚠️ Text contains multiple sentences, likely not a title: {text[:50]}...")
+            logger.warning(f"⚠️ Text contains multiple sentences, likely not a title: {text[:50]}...")
             return False
 
         return True
 
-    def _save_verified_patent(self, patent: Dict[str, Any], compound: str) -> None:
-        """Save verified patent to JSON file."""
+    def _load_saved_patents(self, output_path: str) -> List[Dict[str, Any]]:
+        """Load patents saved by earlier runs, including any left in an unfinished journal."""
+        patents = []
+
         try:
-            output_path = Config.get_output_path(compound)
+            with open(output_path, 'rb') as f:
+                data = orjson.loads(f.read())
+            if isinstance(data, dict) and isinstance(data.get('verified_patents'), list):
+                patents.extend(data['verified_patents'])
+            else:
+                logger.warning(f"⚠️ Ignoring unexpected results format in {output_path}")
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            pass
 
-            try:
-                with open(output_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                data = {"compound": compound, "verified_patents": []}
+        # A journal only survives if a previous run stopped before compacting it
+        try:
+            with open(self._journal_path(output_path), 'rb') as f:
+                for line in f:
+                    if line.strip():
+                        record = orjson.loads(line)
+                        if isinstance(record, dict):
+                            patents.append(record)
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            pass
+
+        unique_patents = {}
+        for patent in patents:
+            if isinstance(patent, dict):
+                unique_patents.setdefault(patent.get('patent_id'), patent)
+        return list(unique_patents.values())
+
+    def _journal_path(self, output_path: str) -> str:
+        """Get the append-only JSONL journal path next to a results file."""
+        return os.path.splitext(output_path)[0] + '.jsonl'
+
+    def _save_verified_patent(self, patent: Dict[str, Any], output_path: str) -> None:
+        """Append verified patent to the JSONL journal next to output_path."""
+        try:
+            if patent['patent_id'] in self._seen_ids:
+                return
+
+            with open(self._journal_path(output_path), 'ab') as f:
+                f.write(orjson.dumps(patent) + b'\n')
+
+            self._seen_ids.add(patent['patent_id'])
+            self._saved_patents.append(patent)
+            logger.info(f"💾 Saved patent {patent['patent_id']} to {self._journal_path(output_path)}")
+
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to save patent: {e}")
+
+    def _compact_saved_patents(self, compound: str, output_path: str) -> None:
+        """Write all saved patents to the results JSON file once and drop the journal."""
+        try:
+            data = {"compound": compound, "verified_patents": self._saved_patents}
 
-            existing_ids = {p.get('patent_id') for p in data.get('verified_patents', [])}
-            if patent['patent_id'] not in existing_ids:
-                data["verified_patents"].append(patent)
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                print(f"💾 Saved patent {patent['patent_id']} to {output_path}")
+            try:
+                os.remove(self._journal_path(output_path))
+            except FileNotFoundError:
+                pass
+            logger.info(f"💾 Wrote {len(self._saved_patents)} patents to {output_path}")
 
         except Exception as e:
-            print(f"⚠️ Failed to save patent: {e}")
\ No newline at end of file
+            logger.warning(f"⚠️ Failed to write results: {e}")